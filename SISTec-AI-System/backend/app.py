@@ -1,6 +1,23 @@
-from flask import Flask, render_template, request, redirect, url_for, session, abort, Response
+from flask import Flask, render_template, request, redirect, url_for, session, abort, Response, make_response
+from flask_compress import Compress
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+import atexit
+import hashlib
+import hmac
+import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 
 # --- Path Configuration (Template Folder Fix) ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -11,121 +28,380 @@ app = Flask(__name__, template_folder=TEMPLATE_DIR)
 # Session secret key for managing user login state
 # IMPORTANT: Change this to a truly random value in production
 app.secret_key = 'super_secret_key_for_sistec_ai'
+
+# Server-side sessions: when REDIS_URL is set, session data lives in Redis and the
+# cookie only carries a signed session id. Without it, Flask's cookie sessions are used.
+REDIS_URL = os.environ.get("REDIS_URL")
+_REDIS = None
+if REDIS_URL:
+    import redis
+    from flask_session import Session
+
+    _REDIS = redis.Redis.from_url(REDIS_URL)
+    app.config.update(
+        SESSION_TYPE="redis",
+        SESSION_REDIS=_REDIS,
+        SESSION_USE_SIGNER=True,
+        SESSION_PERMANENT=False,
+        # Only write the session back to Redis (and send Set-Cookie) when it changed,
+        # so plain page views and 304 dashboard responses cost no Redis write
+        SESSION_REFRESH_EACH_REQUEST=False,
+    )
+    Session(app)
 # -----------------------------------------------
 
-# Database Connection function
+# Response compression (Brotli, falling back to gzip) for HTML above 500 bytes
+app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+app.config["COMPRESS_MIN_SIZE"] = 500
+Compress(app)
+
+# --- Logging ---
+# Log records are handed to a background thread through a queue so request
+# handlers never block on writing to stderr.
+_LOG_QUEUE = queue.Queue(-1)
+_LOG_LISTENER = logging.handlers.QueueListener(_LOG_QUEUE, logging.StreamHandler())
+_LOG_LISTENER.start()
+atexit.register(_LOG_LISTENER.stop)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.handlers.QueueHandler(_LOG_QUEUE))
+logger.setLevel(logging.INFO)
+
+# Database Connection Pool
+# Connections are checked out/in per request instead of opening a fresh
+# TCP + auth handshake to PostgreSQL every time. psycopg2 opens all 'minconn'
+# connections as soon as the pool is built, and every gunicorn worker builds its
+# own pool, so keep both bounds at the worker's thread count: a sync worker serves
+# one request at a time and needs 1, `--threads N` needs N (set DB_POOL_MAX=N).
+# NOTE: Please ensure your database settings (host, dbname, user, password) are correct.
+POOL_MAX_CONN = max(1, int(os.environ.get("DB_POOL_MAX", 1)))
+POOL_MIN_CONN = min(POOL_MAX_CONN, max(0, int(os.environ.get("DB_POOL_MIN", 1))))
+POOL_RECYCLE = 1800  # seconds; reconnect before the server/proxy idles the socket out
+POOL_PRE_PING_IDLE = 30  # seconds idle after which a connection is pinged before reuse
+POOL_CHECKOUT_TIMEOUT = 10  # seconds to wait for a free connection when all are in use
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+# ThreadedConnectionPool raises PoolError instead of waiting once maxconn connections are
+# checked out, so extra requests queue on this semaphore for a free slot instead
+_POOL_SLOTS = threading.BoundedSemaphore(POOL_MAX_CONN)
+
+class _PooledConnection(psycopg2.extensions.connection):
+    # Remembers when it was opened and last returned, so old connections can be
+    # recycled and idle ones pinged before reuse
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = self.last_used = time.monotonic()
+
+def _get_pool():
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadedConnectionPool(
+                    minconn=POOL_MIN_CONN,
+                    maxconn=POOL_MAX_CONN,
+                    connection_factory=_PooledConnection,
+                    host="localhost",
+                    database="Chatbot",
+                    user="postgres",
+                    password="root"
+                )
+    return _POOL
+
 def get_db_connection():
-    # PostgreSQL database se connect karta hai aur connection object return karta hai.
-    # NOTE: Please ensure your database settings (host, dbname, user, password) are correct.
-    return psycopg2.connect(
-        host="localhost",
-        database="Chatbot",
-        user="postgres",
-        password="root"
-    )
+    # Pool se ek PostgreSQL connection nikalta hai; routes get_conn() ke through use karte hain.
+    if not _POOL_SLOTS.acquire(timeout=POOL_CHECKOUT_TIMEOUT):
+        raise PoolError("Timed out waiting for a free database connection")
+    try:
+        pool = _get_pool()
+        conn = pool.getconn()
+        # Closed, too-old or dead connections are dropped until a usable one comes back. A socket
+        # the server or a proxy killed while idle is only noticed by using it, so connections idle
+        # for a while get a 'SELECT 1' first. Freshly opened connections pass without a ping.
+        while not _is_usable(conn):
+            pool.putconn(conn, close=True)
+            conn = pool.getconn()
+    except BaseException:
+        _POOL_SLOTS.release()
+        raise
+    return conn
+
+def _is_usable(conn):
+    if conn.closed:
+        return False
+    now = time.monotonic()
+    if now - conn.created_at > POOL_RECYCLE:
+        return False
+    if now - conn.last_used > POOL_PRE_PING_IDLE:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+        except psycopg2.Error:
+            return False
+    return True
+
+def release_db_connection(conn):
+    # Connection ko pool mein wapas rakhta hai (open transaction ho to pool rollback kar deta hai).
+    try:
+        if conn.autocommit and not conn.closed:
+            conn.autocommit = False
+        conn.last_used = time.monotonic()
+        _get_pool().putconn(conn)
+    finally:
+        _POOL_SLOTS.release()
+
+@contextmanager
+def get_conn():
+    # Pooled connection for one unit of work: rolled back if the block raises,
+    # and always returned to the pool.
+    conn = get_db_connection()
+    try:
+        yield conn
+    except Exception:
+        if not conn.closed:
+            try:
+                conn.rollback() # Ensure no partial transactions are committed
+            except psycopg2.Error:
+                pass
+        raise
+    finally:
+        release_db_connection(conn)
+
+@atexit.register
+def _close_pool():
+    if _POOL is not None:
+        _POOL.closeall()
+
+# --- Answer Cache (exact match on normalized question text) ---
+# Keeps recently answered questions so a repeat question can be auto-answered
+# without the duplicate lookup round-trip to PostgreSQL. With REDIS_URL set the
+# cache is shared by all workers; otherwise it is kept in a bounded in-process LRU.
+# Answers already live in 'query_responses', so losing the cache just re-warms it.
+ANSWER_CACHE_TTL = 3600  # seconds
+ANSWER_CACHE_PREFIX = "answer:"
+ANSWER_CACHE_SIZE = 4096  # entries kept in process memory
+_ANSWER_CACHE = OrderedDict()  # key -> (stored_at, response_text), least recently used first
+_ANSWER_CACHE_LOCK = threading.Lock()
+
+def _answer_cache_key(query_text):
+    # Same matching rule as the duplicate lookup in SQL: LOWER(query_text) = LOWER(%s)
+    return hashlib.sha256(query_text.strip().lower().encode("utf-8")).hexdigest()
+
+def get_cached_answer(query_text):
+    key = _answer_cache_key(query_text)
+    if _REDIS is not None:
+        try:
+            cached = _REDIS.get(ANSWER_CACHE_PREFIX + key)
+        except redis.RedisError:
+            logger.exception("Redis error while reading answer cache")
+            return None
+        return cached.decode("utf-8") if cached is not None else None
+
+    with _ANSWER_CACHE_LOCK:
+        entry = _ANSWER_CACHE.get(key)
+        if entry and time.time() - entry[0] < ANSWER_CACHE_TTL:
+            _ANSWER_CACHE.move_to_end(key)
+            return entry[1]
+    return None
+
+def cache_answer(query_text, response_text):
+    key = _answer_cache_key(query_text)
+    if _REDIS is not None:
+        try:
+            _REDIS.set(ANSWER_CACHE_PREFIX + key, response_text, ex=ANSWER_CACHE_TTL)
+        except redis.RedisError:
+            logger.exception("Redis error while writing answer cache")
+        return
+
+    with _ANSWER_CACHE_LOCK:
+        _ANSWER_CACHE[key] = (time.time(), response_text)
+        _ANSWER_CACHE.move_to_end(key)
+        if len(_ANSWER_CACHE) > ANSWER_CACHE_SIZE:
+            _ANSWER_CACHE.popitem(last=False)
+
+# --- Static Page Rendering ---
+# Pages rendered without any context (home, plain login/register forms) are
+# rendered once per process and served from memory with a client cache header.
+STATIC_PAGE_MAX_AGE = 300  # seconds
+
+@lru_cache(maxsize=16)
+def _render_static(template_name):
+    return render_template(template_name)
+
+def render_static_page(template_name):
+    # Only for GETs with no dynamic context (never when an error message is shown).
+    resp = make_response(_render_static(template_name))
+    resp.headers["Cache-Control"] = f"public, max-age={STATIC_PAGE_MAX_AGE}"
+    return resp
+
+# --- HELPER FUNCTION: Conditional GET ---
+def etag_matches(etag):
+    # Flask-Compress appends ":<algorithm>" to the ETag of compressed responses,
+    # so compare only the part before it.
+    return any(tag.split(":", 1)[0] == etag for tag in request.if_none_match.as_set())
 
 # --- Main Landing Page ---
 @app.route("/")
 def home():
     # Home page render karta hai jahan se user Student/Admin select karta hai.
-    return render_template("home.html")
+    return render_static_page("home.html")
+
+# --- HELPER FUNCTIONS: Password Hashing ---
+# New passwords are stored as argon2 hashes in the 'password' column (argon2-cffi releases
+# the GIL while hashing, so concurrent logins don't serialize). Older Werkzeug PBKDF2 hashes
+# and plain passwords still verify and are upgraded to argon2 on the next successful login.
+_PASSWORD_HASHER = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+_ARGON2_PREFIX = "$argon2"
+_WERKZEUG_PREFIXES = ("pbkdf2:", "scrypt:")
+
+# Recent verification results, so repeat logins skip the KDF entirely.
+# Keyed on an HMAC of the password, never the raw password.
+_VERIFY_CACHE_SIZE = 4096
+_VERIFY_CACHE = OrderedDict()  # (password_hash, hmac digest) -> bool
+_VERIFY_CACHE_LOCK = threading.Lock()
+
+# Set once an upgrade UPDATE is rejected as too long for the password column (indexes.sql
+# widens it), so logins stop re-hashing and failing the same UPDATE every time.
+_PASSWORD_UPGRADE_DISABLED = False
+
+def hash_password(password):
+    return _PASSWORD_HASHER.hash(password)
+
+def _check_password_hash(password_hash, password):
+    if password_hash.startswith(_ARGON2_PREFIX):
+        try:
+            return _PASSWORD_HASHER.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(password_hash, password)
+
+def _check_password_hash_cached(password_hash, password):
+    digest = hmac.new(app.secret_key.encode("utf-8"), password.encode("utf-8"), hashlib.sha256).digest()
+    key = (password_hash, digest)
+    with _VERIFY_CACHE_LOCK:
+        if key in _VERIFY_CACHE:
+            _VERIFY_CACHE.move_to_end(key)
+            return _VERIFY_CACHE[key]
+
+    result = _check_password_hash(password_hash, password)
+
+    with _VERIFY_CACHE_LOCK:
+        _VERIFY_CACHE[key] = result
+        if len(_VERIFY_CACHE) > _VERIFY_CACHE_SIZE:
+            _VERIFY_CACHE.popitem(last=False)
+    return result
+
+def verify_password(stored_password, input_password):
+    if stored_password.startswith(_ARGON2_PREFIX) or stored_password.startswith(_WERKZEUG_PREFIXES):
+        return _check_password_hash_cached(stored_password, input_password)
+    # Accounts created before hashing was introduced still hold the plain password
+    return hmac.compare_digest(stored_password.encode("utf-8"), input_password.encode("utf-8"))
+
+def password_needs_rehash(stored_password):
+    if stored_password.startswith(_ARGON2_PREFIX):
+        return _PASSWORD_HASHER.check_needs_rehash(stored_password)
+    return True
+
+def upgrade_password_hash(update_sql, key, password):
+    # Re-stores a verified password with the current argon2 parameters. Best effort:
+    # a failure here is logged and must not fail the login itself.
+    global _PASSWORD_UPGRADE_DISABLED
+    if _PASSWORD_UPGRADE_DISABLED:
+        return
+    password_hash = hash_password(password)
+    try:
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute(update_sql, (password_hash, key))
+            conn.commit()
+    except psycopg2.DataError:
+        _PASSWORD_UPGRADE_DISABLED = True
+        logger.warning("Password column too narrow for argon2 hashes; run indexes.sql. "
+                       "Skipping further password hash upgrades.")
+    except psycopg2.Error:
+        logger.exception("Database error while upgrading password hash")
 
 # --- HELPER FUNCTION: Get Student Info (from 'users' table) ---
 def get_student_info(email):
-    conn = None
-    cur = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        # Fetches data from the 'users' table
-        cur.execute("SELECT user_id, full_name, password FROM users WHERE email = %s;", (email,))
-        user_data = cur.fetchone()
-
-        if user_data:
-            # Returns (user_id, full_name, password)
-            return user_data
-        return None
-    except psycopg2.Error as e:
-        print(f"Database error while fetching student: {e}")
+        with get_conn() as conn:
+            # Read-only lookup: autocommit means no transaction is opened, so none has to be
+            # rolled back when the connection goes back to the pool
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                # Fetches data from the 'users' table
+                cur.execute("SELECT user_id, full_name, password FROM users WHERE LOWER(email) = LOWER(%s);", (email,))
+                # Returns (user_id, full_name, password_hash), or None if not found
+                return cur.fetchone()
+    except psycopg2.Error:
+        logger.exception("Database error while fetching student")
         return None
-    finally:
-        if cur: cur.close()
-        if conn: conn.close()
 
 # --- HELPER FUNCTION: Get Admin Info (from 'admin' table) ---
 def get_admin_info(email):
-    conn = None
-    cur = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        # Fetches data from the dedicated 'admin' table
-        cur.execute("SELECT email, password FROM admin WHERE email = %s;", (email,))
-        admin_data = cur.fetchone()
-
-        if admin_data:
-            # Returns (email, password)
-            return admin_data
-        return None
-    except psycopg2.Error as e:
-        print(f"Database error while fetching admin: {e}")
+        with get_conn() as conn:
+            # Read-only lookup: autocommit means no transaction is opened, so none has to be
+            # rolled back when the connection goes back to the pool
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                # Fetches data from the dedicated 'admin' table
+                cur.execute("SELECT email, password FROM admin WHERE LOWER(email) = LOWER(%s);", (email,))
+                # Returns (email, password_hash), or None if not found
+                return cur.fetchone()
+    except psycopg2.Error:
+        logger.exception("Database error while fetching admin")
         return None
-    finally:
-        if cur: cur.close()
-        if conn: conn.close()
 
 # --- 1. Registration Route ---
 @app.route("/register", methods=["GET", "POST"])
 def register():
-    conn = None
-    cur = None
     error_message = None
 
     if request.method == "POST":
+        # Extract form data
+        name = request.form["name"]
+        address = request.form.get("address", "")
+        mobile = request.form.get("mobile", "")
+        email = request.form["email"]
+        password = request.form["password"]
+
+        if not all([name, email, password]):
+            error_message = "All fields are required."
+            return render_template("register.html", error=error_message)
+
+        # Hash before checking out a connection so the pool isn't held while hashing
+        password_hash = hash_password(password)
+
         try:
-            # Extract form data
-            name = request.form["name"]
-            address = request.form.get("address", "")
-            mobile = request.form.get("mobile", "")
-            email = request.form["email"]
-            password = request.form["password"]
-
-            if not all([name, email, password]):
-                error_message = "All fields are required."
-                return render_template("register.html", error=error_message)
-
-            conn = get_db_connection()
-            cur = conn.cursor()
-
-            # Check if user already exists in 'users' table
-            if get_student_info(email):
-                error_message = "This email address is already registered. Please login."
-                return render_template("register.html", error=error_message)
-
-            # Insert new user into the database
-            cur.execute("""
-                INSERT INTO users (full_name, email, mobile, password, address)
-                VALUES (%s, %s, %s, %s, %s);
-            """, (name, email, mobile, password, address))
+            with get_conn() as conn, conn.cursor() as cur:
+                # Insert new user into the database in one round-trip. A duplicate email hits the
+                # unique index on users.email and inserts nothing, so no row comes back.
+                cur.execute("""
+                    INSERT INTO users (full_name, email, mobile, password, address)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT DO NOTHING
+                    RETURNING user_id;
+                """, (name, email, mobile, password_hash, address))
 
-            conn.commit()
+                if cur.fetchone() is not None:
+                    conn.commit()
 
-            # Registration successful, redirect to Student Login
-            return redirect(url_for('student_login_page'))
+                    # Registration successful, redirect to Student Login
+                    return redirect(url_for('student_login_page'))
+
+            error_message = "This email address is already registered. Please login."
 
         except psycopg2.IntegrityError:
-            if conn: conn.rollback()
             error_message = "This email address is already registered. Please login."
 
-        except psycopg2.Error as e:
-            if conn: conn.rollback()
-            print(f"Database error during registration: {e}")
+        except psycopg2.Error:
+            logger.exception("Database error during registration")
             error_message = "Registration failed due to a server error."
 
-        finally:
-            if cur: cur.close()
-            if conn: conn.close()
-
+    if error_message is None:
+        return render_static_page("register.html")
     return render_template("register.html", error=error_message)
 
 # --- 2A. Student Login Route (/login) ---
@@ -142,7 +418,10 @@ def student_login_page():
         if user_info:
             user_id, full_name, stored_password = user_info
 
-            if input_password == stored_password:
+            if verify_password(stored_password, input_password):
+                if password_needs_rehash(stored_password):
+                    upgrade_password_hash("UPDATE users SET password = %s WHERE user_id = %s;", user_id, input_password)
+
                 # Student login successful
                 session.clear()
                 session['logged_in'] = True
@@ -156,6 +435,8 @@ def student_login_page():
         else:
             error_message = "Invalid email or password."
 
+    if error_message is None:
+        return render_static_page("st_login.html")
     return render_template("st_login.html", error=error_message)
 
 # --- 2B. Admin Login Route (/admin_login) ---
@@ -172,7 +453,10 @@ def admin_login_page():
         if admin_info:
             _, stored_password = admin_info # email is the first item, password is the second
 
-            if input_password == stored_password:
+            if verify_password(stored_password, input_password):
+                if password_needs_rehash(stored_password):
+                    upgrade_password_hash("UPDATE admin SET password = %s WHERE LOWER(email) = LOWER(%s);", email, input_password)
+
                 # Admin login successful
                 session.clear()
                 session['logged_in'] = True
@@ -185,6 +469,8 @@ def admin_login_page():
         else:
             error_message = "Invalid email or password."
 
+    if error_message is None:
+        return render_static_page("ad_login.html")
     return render_template("ad_login.html", error=error_message)
 
 # --- Logout Route ---
@@ -195,6 +481,10 @@ def logout():
     return redirect(url_for('student_login_page'))
 
 # --- User Chat Page (Protected) ---
+HISTORY_PAGE_SIZE = 50  # queries shown per page on the student dashboard
+# Part of the dashboard ETag, so a template change on deploy invalidates cached pages
+_DASHBOARD_TEMPLATE_MTIME = os.path.getmtime(os.path.join(TEMPLATE_DIR, "st_dashboard.html"))
+
 @app.route("/user", methods=["GET", "POST"])
 def user_chat_page():
 
@@ -203,152 +493,179 @@ def user_chat_page():
         return redirect(url_for('student_login_page'))
 
     user_id = session.get('user_id')
-    conn = None
-    cur = None
+    full_name = session.get('full_name')
 
     # NEW SAFETY CHECK: Check if user_id is valid before proceeding to database operations
     if user_id is None or (not isinstance(user_id, int) and not str(user_id).isdigit()):
-        print(f"Session Error: Invalid or missing user_id in session: {user_id}. Clearing session.")
+        logger.warning("Session Error: Invalid or missing user_id in session: %r. Clearing session.", user_id)
         session.clear()
         return redirect(url_for('student_login_page'))
 
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
+        with get_conn() as conn, conn.cursor() as cur:
+            if request.method == "POST":
+                # Handle new query submission
+                query_text = request.form["query_text"].strip()
+
+                if not query_text:
+                    # ignore empty queries
+                    return redirect(url_for('user_chat_page'))
+
+                # --------- DUPLICATE QUESTION CHECK (search across answered queries) ---------
+                # Check the in-memory answer cache first. On a miss, a single statement looks for a
+                # previously answered query with same text (case-insensitive), inserts the new query
+                # as 'answered' or 'pending', and copies the old answer over if there was one.
+                old_answer = get_cached_answer(query_text)
+
+                if old_answer is not None:
+                    # Old answer known -> create a new query record auto-filled with it
+                    cur.execute("""
+                        WITH new_q AS (
+                            INSERT INTO queries(user_id, query_text, status)
+                            VALUES (%s, %s, 'answered')
+                            RETURNING query_id
+                        )
+                        INSERT INTO query_responses(query_id, response_text)
+                        SELECT query_id, %s FROM new_q;
+                    """, (user_id, query_text, old_answer))
+                else:
+                    cur.execute("""
+                        WITH dup AS (
+                            SELECT r.response_text
+                            FROM queries q
+                            JOIN query_responses r ON q.query_id = r.query_id
+                            WHERE LOWER(q.query_text) = LOWER(%(query_text)s)
+                              AND r.response_text IS NOT NULL
+                            ORDER BY q.query_id DESC
+                            LIMIT 1
+                        ), new_q AS (
+                            INSERT INTO queries(user_id, query_text, status)
+                            VALUES (%(user_id)s, %(query_text)s,
+                                    CASE WHEN EXISTS (SELECT 1 FROM dup) THEN 'answered' ELSE 'pending' END)
+                            RETURNING query_id
+                        )
+                        INSERT INTO query_responses(query_id, response_text)
+                        SELECT new_q.query_id, dup.response_text FROM new_q, dup
+                        RETURNING response_text;
+                    """, {"user_id": user_id, "query_text": query_text})
+                    found = cur.fetchone()
+                    if found:
+                        cache_answer(query_text, found[0])
 
-        if request.method == "POST":
-            # Handle new query submission
-            query_text = request.form["query_text"].strip()
+                conn.commit()
 
-            if not query_text:
-                # ignore empty queries
-                return redirect(url_for('user_chat_page'))
+                return redirect(url_for('user_chat_page')) # Single redirect after successful POST
 
-            # --------- DUPLICATE QUESTION CHECK (search across answered queries) ---------
-            # We search for any previously answered query with same text (case-insensitive).
+            # GET: First a cheap per-user version check (latest query id plus answered/pending
+            # counts). If the browser's ETag still matches, answer 304 without fetching or
+            # rendering the history at all. The pending count (helpful for UI) comes from here too.
+            before = request.args.get("before", type=int)
             cur.execute("""
-                SELECT q.query_id, r.response_text
+                SELECT MAX(query_id),
+                       COUNT(*) FILTER (WHERE status = 'answered'),
+                       COUNT(*) FILTER (WHERE status IS DISTINCT FROM 'answered')
+                FROM queries
+                WHERE user_id = %s;
+            """, (user_id,))
+            last_query_id, answered_count, pending_count = cur.fetchone()
+
+            etag = hashlib.sha1(
+                f"{user_id}|{full_name}|{before}|{last_query_id}|{answered_count}|{pending_count}|{_DASHBOARD_TEMPLATE_MTIME}".encode("utf-8")
+            ).hexdigest()
+            if etag_matches(etag):
+                return dashboard_response("", etag, status=304)
+
+            # Fetch one page of previous queries and responses for the user, including status.
+            # Keyset pagination: '?before=<query_id>' continues below the last id of the previous
+            # page, so deep pages cost the same index seek as the first one.
+            before_clause = "AND q.query_id < %(before)s" if before else ""
+            cur.execute(f"""
+                SELECT q.query_id, q.query_text, r.response_text, q.status
                 FROM queries q
-                JOIN query_responses r ON q.query_id = r.query_id
-                WHERE LOWER(q.query_text) = LOWER(%s)
-                  AND r.response_text IS NOT NULL
+                LEFT JOIN query_responses r ON q.query_id = r.query_id
+                WHERE q.user_id = %(user_id)s {before_clause}
                 ORDER BY q.query_id DESC
-                LIMIT 1;
-            """, (query_text,))
-            found = cur.fetchone()
-
-            if found:
-                # Old answered query found -> create a new query record but auto-fill with old answer
-                old_qid, old_answer = found
-
-                # Insert new query and mark as answered
-                cur.execute("""
-                    INSERT INTO queries(user_id, query_text, status)
-                    VALUES (%s, %s, %s)
-                    RETURNING query_id;
-                """, (user_id, query_text, 'answered'))
-                new_qid = cur.fetchone()[0]
+                LIMIT %(limit)s;
+            """, {"user_id": user_id, "before": before, "limit": HISTORY_PAGE_SIZE})
+            rows = cur.fetchall() # rows is a list of (query_id, query_text, response_text, status)
 
-                # Copy the old answer into query_responses for the new query
-                cur.execute("""
-                    INSERT INTO query_responses(query_id, response_text)
-                    VALUES (%s, %s);
-                """, (new_qid, old_answer))
+    except psycopg2.Error:
+        # Proper error handling: log error and return 500 error page (get_conn rolls back)
+        logger.exception("Database error in user_chat_page route")
+        return "A database error occurred.", 500
 
-                conn.commit()
-                return redirect(url_for('user_chat_page'))
+    # Cursor for the next (older) page, if there may be one
+    next_before = rows[-1][0] if len(rows) == HISTORY_PAGE_SIZE else None
 
-            # If not found -> normal flow: create pending query
-            cur.execute("""
-                INSERT INTO queries(user_id, query_text, status)
-                VALUES (%s, %s, %s);
-            """, (user_id, query_text, 'pending'))
-            conn.commit()
+    # Renders the st_dashboard.html (Student Chat Interface)
+    page_html = render_template("st_dashboard.html", queries=rows, full_name=full_name, pending_count=pending_count, next_before=next_before)
+    return dashboard_response(page_html, etag)
 
-            return redirect(url_for('user_chat_page')) # Single redirect after successful POST
-
-        # GET: Fetch all previous queries and responses for the user, including status
-        cur.execute("""
-           SELECT q.query_id, q.query_text, r.response_text, q.status
-FROM queries q
-LEFT JOIN query_responses r ON q.query_id = r.query_id
-WHERE q.user_id = %s
-ORDER BY q.query_id DESC;
-
-        """, (user_id,))
-        rows = cur.fetchall() # rows is a list of (query_id, query_text, response_text, status)
-
-        # Also compute pending count for this user (helpful for UI)
-        cur.execute("""
-            SELECT COUNT(*) FROM queries
-            WHERE user_id = %s AND (status IS NULL OR status != 'answered');
-        """, (user_id,))
-        pending_count = cur.fetchone()[0] if cur.rowcount != 0 else 0
-
-        # Renders the st_dashboard.html (Student Chat Interface)
-        return render_template("st_dashboard.html", queries=rows, full_name=session.get('full_name'), pending_count=pending_count)
-
-    except psycopg2.Error as e:
-        # Proper error handling: print error, rollback, and return 500 error page
-        print(f"Database error in user_chat_page route: {e}")
-        if conn:
-            conn.rollback() # Ensure no partial transactions are committed
-        return "A database error occurred.", 500
-
-    finally:
-        # Ensure connections are closed regardless of success or failure
-        if cur: cur.close()
-        if conn: conn.close()
+def dashboard_response(body, etag, status=200):
+    # Browsers must revalidate every time, but an unchanged dashboard costs only a 304
+    resp = make_response(body, status)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
 
 # --- Admin Page (Protected) ---
+ADMIN_PAGE_SIZE = 50  # pending queries shown per page on the admin dashboard
+
 @app.route("/admin", methods=["GET", "POST"])
 def admin():
     # Security Check: Must be logged in AND must be an admin (using the new session['role'])
     if not session.get('logged_in') or session.get('role') != 'admin':
         return redirect(url_for('admin_login_page'))
 
-    conn = None
-    cur = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-
-        if request.method == "POST":
-            # Handle admin response submission
-            query_id = request.form["query_id"]
-            response_text = request.form["response_text"]
-
-            # 1. Insert response
-            cur.execute("INSERT INTO query_responses(query_id, response_text) VALUES (%s, %s);", (query_id, response_text))
-
-            # 2. Update query status to 'answered'
-            cur.execute("UPDATE queries SET status='answered' WHERE query_id=%s;", (query_id,))
-
-            conn.commit()
+        with get_conn() as conn, conn.cursor() as cur:
+            if request.method == "POST":
+                # Handle admin response submission
+                query_id = request.form["query_id"]
+                response_text = request.form["response_text"]
 
-            return redirect(url_for('admin'))
+                # Insert response and update query status to 'answered' in one round-trip
+                cur.execute("""
+                    WITH ins AS (
+                        INSERT INTO query_responses(query_id, response_text)
+                        VALUES (%s, %s)
+                        RETURNING query_id
+                    )
+                    UPDATE queries SET status='answered'
+                    WHERE query_id = (SELECT query_id FROM ins);
+                """, (query_id, response_text))
 
-        # Fetch all pending queries (where there is no response yet)
-        cur.execute("""
-        SELECT q.query_id, q.query_text, u.full_name
-        FROM queries q
-        LEFT JOIN query_responses r ON q.query_id = r.query_id
-        JOIN users u ON q.user_id = u.user_id
-        WHERE r.response_id IS NULL
-        ORDER BY q.query_id ASC;
-        """)
-        rows = cur.fetchall()
+                conn.commit()
 
-        return render_template("ad_dash.html", queries=rows)
+                return redirect(url_for('admin'))
 
-    except psycopg2.Error as e:
-        print(f"Database error in admin route: {e}")
-        if conn: conn.rollback()
+            # Fetch one page of pending queries (oldest first). 'status' is the source of truth,
+            # so no anti-join against query_responses is needed; anything not 'answered' (NULL
+            # included) counts as pending, same as on the student dashboard. Keyset pagination via
+            # '?after=<query_id>'; the total pending count comes back on every row so the UI
+            # needs no second round-trip (a subquery rather than COUNT(*) OVER (), which would
+            # only count the rows after the cursor).
+            after = request.args.get("after", 0, type=int)
+            cur.execute("""
+            SELECT q.query_id, q.query_text, u.full_name,
+                   (SELECT COUNT(*) FROM queries WHERE status IS DISTINCT FROM 'answered')
+            FROM queries q
+            JOIN users u ON q.user_id = u.user_id
+            WHERE q.status IS DISTINCT FROM 'answered' AND q.query_id > %s
+            ORDER BY q.query_id ASC
+            LIMIT %s;
+            """, (after, ADMIN_PAGE_SIZE))
+            rows = cur.fetchall() # rows is a list of (query_id, query_text, full_name, pending_total)
+
+    except psycopg2.Error:
+        logger.exception("Database error in admin route")
         return "A database error occurred.", 500
 
-    finally:
-        if cur: cur.close()
-        if conn: conn.close()
+    pending_total = rows[0][3] if rows else 0
+    # Cursor for the next page, if there may be one
+    next_after = rows[-1][0] if len(rows) == ADMIN_PAGE_SIZE else None
+
+    return render_template("ad_dash.html", queries=rows, pending_total=pending_total, next_after=next_after)
 
 # --- Placeholder for Success Page (redirecting to student login) ---
 @app.route("/success")
@@ -0,0 +1,35 @@
+-- Schema changes and indexes backing the hot queries in app.py.
+-- Safe to re-run: psql -d Chatbot -f indexes.sql
+
+-- Password columns hold argon2id hashes (~97 characters), so they must not be narrower
+-- than that. A no-op on columns that are already text.
+ALTER TABLE users ALTER COLUMN password TYPE text;
+ALTER TABLE admin ALTER COLUMN password TYPE text;
+
+-- Duplicate-question lookup in user_chat_page: WHERE LOWER(q.query_text) = LOWER(%s).
+-- A hash index, since the lookup is equality-only and a btree would reject long questions.
+CREATE INDEX IF NOT EXISTS idx_queries_lower_text_hash ON queries USING hash (LOWER(query_text));
+
+-- Join from queries to their responses
+CREATE INDEX IF NOT EXISTS idx_responses_query_id ON query_responses (query_id);
+
+-- Login lookups (WHERE LOWER(email) = LOWER(%s)); registration also relies on this
+-- to reject duplicate emails (no pre-check SELECT)
+CREATE UNIQUE INDEX IF NOT EXISTS users_email_idx ON users (LOWER(email));
+CREATE UNIQUE INDEX IF NOT EXISTS admin_email_idx ON admin (LOWER(email));
+
+-- Student dashboard history: WHERE user_id = %s ORDER BY query_id DESC LIMIT 50.
+-- Also serves the dashboard's version check (MAX(query_id) and status counts) as an index-only scan.
+-- query_text is deliberately not included: it is unbounded user input and a long question
+-- would exceed the btree row size limit and fail the INSERT.
+CREATE INDEX IF NOT EXISTS idx_queries_user_qid_status ON queries (user_id, query_id DESC) INCLUDE (status);
+
+-- Admin dashboard pending list: WHERE status IS DISTINCT FROM 'answered' ORDER BY query_id
+CREATE INDEX IF NOT EXISTS idx_queries_unanswered ON queries (query_id) WHERE status IS DISTINCT FROM 'answered';
+
+-- Superseded indexes: dropped so databases that ran an older version of this script
+-- don't keep maintaining them on every write
+DROP INDEX IF EXISTS idx_queries_user_unanswered;
+DROP INDEX IF EXISTS idx_queries_pending;
+DROP INDEX IF EXISTS idx_queries_user_qid;
+DROP INDEX IF EXISTS idx_queries_lower_text;